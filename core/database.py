@@ -1,13 +1,104 @@
+import random
 import sqlite3
+import threading
+import time
 from pathlib import Path
 
+from core.models import quest_row_factory, version_row_factory
+
 DB_PATH = Path("quests.db")
 
+# Политика записи при конкуренции нескольких писателей за один файл базы
+BUSY_TIMEOUT = 5.0        # сколько SQLite сам ждёт снятия блокировки, сек
+RETRY_ATTEMPTS = 6        # сколько раз повторяем транзакцию после "database is locked"
+RETRY_BASE_DELAY = 0.02   # первая пауза перед повтором, дальше — удвоение со случайным разбросом
+
+# Счётчики записи в этом процессе (для нагрузочного стенда и статистики писателя)
+write_stats = {"transactions": 0, "retries": 0, "lock_wait_seconds": 0.0}
+_write_stats_lock = threading.Lock()
+
+# Колонки для списков квестов — без тяжёлого описания
+BROWSE_COLUMNS = ("id", "title", "difficulty", "reward", "deadline", "created_at")
+
+# Подписчики на запись (например, кеш чтения): callback вызывается со списком id изменённых
+# квестов после коммита, before_write — перед началом каждой транзакции записи
+_write_listeners = []
+_before_write_listeners = []
+
+
+def add_write_listener(callback, before_write=None):
+    _write_listeners.append(callback)
+    if before_write is not None:
+        _before_write_listeners.append(before_write)
+
+
+def _notify_written(quest_ids):
+    for callback in _write_listeners:
+        callback(quest_ids)
+
+
+def _notify_writing():
+    for callback in _before_write_listeners:
+        callback()
+
+
+def connect_for_write(path=None):
+    """Соединение для записи: транзакции открываются явно через run_write_transaction."""
+    return sqlite3.connect(path or DB_PATH, timeout=BUSY_TIMEOUT, isolation_level=None)
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def run_write_transaction(conn, work, attempts=RETRY_ATTEMPTS, base_delay=RETRY_BASE_DELAY):
+    """
+    Выполняет work(cursor) в транзакции BEGIN IMMEDIATE и возвращает её результат.
+
+    Блокировка на запись берётся сразу, поэтому два писателя не упираются в взаимную
+    блокировку при повышении SHARED → RESERVED. Если база всё же занята дольше BUSY_TIMEOUT,
+    транзакция повторяется с экспоненциальной паузой и случайным разбросом.
+    """
+    _notify_writing()
+    retries = 0
+    lock_wait = 0.0
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                lock_wait += time.perf_counter() - started
+                result = work(conn.cursor())
+                conn.execute("COMMIT")
+                return result
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                else:
+                    lock_wait += time.perf_counter() - started
+                if not _is_busy(e) or retries + 1 >= attempts:
+                    raise
+                time.sleep(base_delay * (2 ** retries) * random.uniform(0.5, 1.5))
+                retries += 1
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+    finally:
+        with _write_stats_lock:
+            write_stats["transactions"] += 1
+            write_stats["retries"] += retries
+            write_stats["lock_wait_seconds"] += lock_wait
+
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT)
     cur = conn.cursor()
 
+    # WAL: читатели не блокируют писателя и наоборот (режим сохраняется в файле базы)
+    cur.execute("PRAGMA journal_mode=WAL")
+
     # Основная таблица квестов
     cur.execute("""
         CREATE TABLE IF NOT EXISTS quests (
@@ -35,57 +126,219 @@ def init_db():
         )
     """)
 
+    # Индексы под сортировку в браузере квестов (по индексу неявно идёт и rowid = id)
+    for column in ("difficulty", "reward", "deadline", "created_at"):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_quests_{column} ON quests ({column})")
+
+    # История квеста читается по quest_id (экспорт, просмотр версий)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quest_versions_quest_id
+        ON quest_versions (quest_id, id)
+    """)
+
     conn.commit()
     conn.close()
 
 
+def _upsert_quest(cur, title, difficulty, reward, description, deadline):
+    # RETURNING отдаёт id и при вставке, и при обновлении — lastrowid при UPDATE
+    # на общем соединении (пакетная запись) указывал бы на чужую строку
+    cur.execute("""
+        INSERT INTO quests (title, difficulty, reward, description, deadline)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(title) DO UPDATE SET
+            difficulty = excluded.difficulty,
+            reward = excluded.reward,
+            description = excluded.description,
+            deadline = excluded.deadline
+        RETURNING id
+    """, (title, difficulty, reward, description, deadline))
+    quest_id = cur.fetchone()[0]
+
+    cur.execute("""
+        INSERT INTO quest_versions (quest_id, title, difficulty, reward, description)
+        VALUES (?, ?, ?, ?, ?)
+    """, (quest_id, title, difficulty, reward, description))
+    return quest_id
+
+
 def save_quest(title, difficulty, reward, description, deadline):
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    conn = connect_for_write()
     try:
-        cur.execute("""
-            INSERT INTO quests (title, difficulty, reward, description, deadline)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(title) DO UPDATE SET
-                difficulty = excluded.difficulty,
-                reward = excluded.reward,
-                description = excluded.description,
-                deadline = excluded.deadline
-        """, (title, difficulty, reward, description, deadline))
-
-        quest_id = cur.lastrowid
-        if not quest_id:
-            cur.execute("SELECT id FROM quests WHERE title = ?", (title,))
-            quest_id = cur.fetchone()[0]
-
-        cur.execute("""
-            INSERT INTO quest_versions (quest_id, title, difficulty, reward, description)
-            VALUES (?, ?, ?, ?, ?)
-        """, (quest_id, title, difficulty, reward, description))
-
-        conn.commit()
-        return quest_id
+        quest_id = run_write_transaction(
+            conn, lambda cur: _upsert_quest(cur, title, difficulty, reward, description, deadline)
+        )
     finally:
         conn.close()
+    _notify_written([quest_id])
+    return quest_id
 
 
-def get_quest_by_id(quest_id):
-    conn = sqlite3.connect(DB_PATH)
+def save_quests(quests):
+    """Сохраняет пачку квестов (title, difficulty, reward, description, deadline) одной транзакцией."""
+    quests = list(quests)
+    conn = connect_for_write()
+    try:
+        quest_ids = run_write_transaction(conn, lambda cur: [_upsert_quest(cur, *quest) for quest in quests])
+    finally:
+        conn.close()
+    _notify_written(quest_ids)
+    return quest_ids
+
+
+def _select_quest(conn, quest_id):
     cur = conn.cursor()
+    cur.row_factory = quest_row_factory
     cur.execute("""
-        SELECT id, title, difficulty, reward, description, deadline
+        SELECT id, title, difficulty, reward, description, deadline, created_at
         FROM quests WHERE id = ?
     """, (quest_id,))
-    row = cur.fetchone()
-    conn.close()
-    if row:
-        return {
-            "id": row[0],
-            "title": row[1],
-            "difficulty": row[2],
-            "reward": row[3],
-            "description": row[4],
-            "deadline": row[5]
-        }
-    return None
\ No newline at end of file
+    return cur.fetchone()
+
+
+def _select_recent_versions(conn, quest_id, limit):
+    cur = conn.cursor()
+    cur.row_factory = version_row_factory
+    cur.execute("""
+        SELECT id, quest_id, title, difficulty, reward, description, created_at
+        FROM quest_versions WHERE quest_id = ?
+        ORDER BY id DESC LIMIT ?
+    """, (quest_id, limit))
+    return cur.fetchall()
+
+
+def get_quest_by_id(quest_id):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return _select_quest(conn, quest_id)
+    finally:
+        conn.close()
+
+
+def get_quest_description(quest_id, conn=None):
+    """Описание квеста — для Quest, загруженных без него."""
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(DB_PATH)
+    try:
+        row = conn.execute("SELECT description FROM quests WHERE id = ?", (quest_id,)).fetchone()
+        return row[0] if row else None
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def load_descriptions(quests, conn=None, batch_size=500):
+    """
+    Подгружает описания сразу для пачки Quest: один запрос на batch_size квестов
+    вместо отдельного соединения и запроса на каждый квест при ленивой загрузке.
+    """
+    pending = {}
+    for quest in quests:
+        if not quest.description_loaded:
+            pending.setdefault(quest.id, []).append(quest)
+    if not pending:
+        return
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(DB_PATH)
+    try:
+        ids = list(pending)
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            rows = conn.execute(
+                f"SELECT id, description FROM quests WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            found = dict(rows)
+            for quest_id in chunk:
+                for quest in pending[quest_id]:
+                    quest.description = found.get(quest_id)
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def iter_quests(with_description=False, batch_size=500):
+    """
+    Все квесты как Quest, пачками через fetchmany — для пакетных задач.
+
+    Без with_description описания не читаются и подгружаются по требованию — по одному
+    запросу на квест; если описания понадобятся многим квестам, читайте их пачкой
+    через load_descriptions.
+    """
+    columns = "id, title, difficulty, reward, deadline, created_at"
+    if with_description:
+        columns += ", description"
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        cur = conn.cursor()
+        cur.row_factory = quest_row_factory
+        cur.execute(f"SELECT {columns} FROM quests ORDER BY id")
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def get_recent_versions(quest_id, limit=5):
+    """Последние версии квеста, от новых к старым."""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return _select_recent_versions(conn, quest_id, limit)
+    finally:
+        conn.close()
+
+
+def _keyset_clause(column, descending, after):
+    """
+    Условие «строки после якоря» для постраничного чтения без OFFSET.
+
+    after — (значение колонки, id) последней строки предыдущей страницы.
+    NULL в SQLite идут первыми при ASC и последними при DESC.
+    """
+    if column == "id":
+        return ("id < ?" if descending else "id > ?"), [after[1]]
+    value, last_id = after
+    if descending:
+        if value is None:
+            return f"({column} IS NULL AND id < ?)", [last_id]
+        return f"(({column}, id) < (?, ?) OR {column} IS NULL)", [value, last_id]
+    if value is None:
+        return f"(({column} IS NULL AND id > ?) OR {column} IS NOT NULL)", [last_id]
+    return f"({column}, id) > (?, ?)", [value, last_id]
+
+
+def _py_lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def fetch_quest_page(conn, sort_column="id", descending=False, after=None, title_filter=None, limit=200):
+    """Страница квестов (кортежи BROWSE_COLUMNS) с сортировкой и фильтром на стороне SQL."""
+    if sort_column not in BROWSE_COLUMNS:
+        raise ValueError(f"Нельзя сортировать по колонке {sort_column!r}")
+    clauses, params = [], []
+    if title_filter:
+        # LIKE в SQLite не различает регистр только для ASCII — кириллицу приводим к нижнему регистру сами
+        conn.create_function("py_lower", 1, _py_lower, deterministic=True)
+        escaped = title_filter.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        clauses.append("py_lower(title) LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    if after is not None:
+        clause, clause_params = _keyset_clause(sort_column, descending, after)
+        clauses.append(clause)
+        params.extend(clause_params)
+    where = " AND ".join(clauses) if clauses else "1"
+    direction = "DESC" if descending else "ASC"
+    order = f"id {direction}" if sort_column == "id" else f"{sort_column} {direction}, id {direction}"
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT {", ".join(BROWSE_COLUMNS)}
+        FROM quests WHERE {where}
+        ORDER BY {order}
+        LIMIT ?
+    """, params + [limit])
+    return cur.fetchall()
@@ -0,0 +1,246 @@
+import argparse
+import csv
+import json
+import re
+import sqlite3
+import zipfile
+from datetime import datetime
+from io import TextIOWrapper
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from core import database
+
+PARCHMENTS_DIR = Path(__file__).parent.parent / "parchments"
+FORMATS = ("jsonl", "csv", "zip")
+BATCH_SIZE = 500
+
+QUEST_FIELDS = ("id", "title", "difficulty", "reward", "description", "deadline", "created_at")
+VERSION_FIELDS = ("id", "quest_id", "title", "difficulty", "reward", "description", "created_at")
+
+# Пергаменты: 12_20250101_120000_1a2b3c4d.pdf, 12_20250101_120000_1a2b3c4d.docx,
+# map_12_20250101_120000.png (и старые имена без суффикса)
+PARCHMENT_RE = re.compile(r"^(?:map_)?(\d+)_\d{8}_\d{6}(?:_[0-9a-f]{8})?\.(?:pdf|docx|png)$")
+
+
+def _quest_filter(since: Optional[str], since_version: Optional[int]):
+    """WHERE-условие для квестов, попадающих в (инкрементальный) экспорт."""
+    clauses, params = [], []
+    if since is not None:
+        clauses.append("q.created_at > ?")
+        params.append(since)
+    if since_version is not None:
+        clauses.append("q.id IN (SELECT quest_id FROM quest_versions WHERE id > ?)")
+        params.append(since_version)
+    where = " AND ".join(clauses) if clauses else "1"
+    return where, params
+
+
+def _iter_rows(cur: sqlite3.Cursor, fields, batch_size: int) -> Iterator[Dict[str, Any]]:
+    """Читает курсор пачками через fetchmany, не держа всю выборку в памяти."""
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield dict(zip(fields, row))
+
+
+def iter_quest_rows(conn: sqlite3.Connection, since: Optional[str] = None, since_version: Optional[int] = None,
+                    batch_size: int = BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    where, params = _quest_filter(since, since_version)
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT {", ".join("q." + f for f in QUEST_FIELDS)}
+        FROM quests q WHERE {where}
+        ORDER BY q.id
+    """, params)
+    return _iter_rows(cur, QUEST_FIELDS, batch_size)
+
+
+def iter_versions(conn: sqlite3.Connection, last_version_id: int, since: Optional[str] = None,
+                  since_version: Optional[int] = None, batch_size: int = BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    where, params = _quest_filter(since, since_version)
+    version_clause = "v.id <= ?"
+    params.append(last_version_id)
+    if since_version is not None:
+        version_clause += " AND v.id > ?"
+        params.append(since_version)
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT {", ".join("v." + f for f in VERSION_FIELDS)}
+        FROM quest_versions v JOIN quests q ON q.id = v.quest_id
+        WHERE {where} AND {version_clause}
+        ORDER BY v.quest_id, v.id
+    """, params)
+    return _iter_rows(cur, VERSION_FIELDS, batch_size)
+
+
+def _attach_versions(quests: Iterator[Dict[str, Any]], versions: Iterator[Dict[str, Any]]):
+    """Слияние двух потоков, отсортированных по id квеста, — без запроса на каждый квест."""
+    pending = next(versions, None)
+    for quest in quests:
+        history = []
+        while pending is not None and pending["quest_id"] <= quest["id"]:
+            if pending["quest_id"] == quest["id"]:
+                history.append(pending)
+            pending = next(versions, None)
+        quest["versions"] = history
+        yield quest
+
+
+def index_parchments(parchments_dir: Optional[Path] = None) -> Dict[int, List[Path]]:
+    """Группирует сохранённые пергаменты и карты по id квеста."""
+    parchments_dir = parchments_dir or PARCHMENTS_DIR
+    index: Dict[int, List[Path]] = {}
+    if not parchments_dir.is_dir():
+        return index
+    for path in sorted(parchments_dir.iterdir()):
+        match = PARCHMENT_RE.match(path.name)
+        if match and path.is_file():
+            index.setdefault(int(match.group(1)), []).append(path)
+    return index
+
+
+def _write_jsonl(stream, records):
+    count = 0
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _write_csv(stream, records, with_versions: bool, with_parchments: bool):
+    fields = list(QUEST_FIELDS)
+    if with_versions:
+        fields.append("versions")
+    if with_parchments:
+        fields.append("parchments")
+    writer = csv.DictWriter(stream, fieldnames=fields)
+    writer.writeheader()
+    count = 0
+    for record in records:
+        if with_versions:
+            record["versions"] = json.dumps(record["versions"], ensure_ascii=False)
+        if with_parchments:
+            record["parchments"] = ";".join(record["parchments"])
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def export_quests(output, format: Optional[str] = None, with_versions: bool = False,
+                  with_parchments: bool = False, since: Optional[str] = None,
+                  since_version: Optional[int] = None, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Потоково выгружает базу квестов в JSONL, CSV или ZIP-архив.
+
+    since — выгрузить только квесты с created_at позже указанного момента;
+    since_version — только квесты, изменённые после версии с этим id.
+    Возвращает сводку с last_version_id для следующего инкрементального запуска.
+    """
+    output = Path(output)
+    format = format or output.suffix.lstrip(".").lower()
+    if format not in FORMATS:
+        raise ValueError("Поддерживаемые форматы: 'jsonl', 'csv', 'zip'")
+
+    conn = sqlite3.connect(database.DB_PATH, isolation_level=None)
+    try:
+        # Одна читающая транзакция — согласованный снимок на всё время выгрузки
+        conn.execute("BEGIN")
+        last_version_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM quest_versions").fetchone()[0]
+
+        records = iter_quest_rows(conn, since, since_version, batch_size)
+        version_count = 0
+        if with_versions:
+            versions = iter_versions(conn, last_version_id, since, since_version, batch_size)
+            records = _attach_versions(records, versions)
+
+        parchment_files: List[Path] = []
+        if with_parchments:
+            parchments = index_parchments()
+
+            def with_files(items):
+                for record in items:
+                    files = parchments.get(record["id"], [])
+                    parchment_files.extend(files)
+                    record["parchments"] = [p.name for p in files]
+                    yield record
+
+            records = with_files(records)
+
+        if with_versions:
+            def counted(items):
+                nonlocal version_count
+                for record in items:
+                    version_count += len(record["versions"])
+                    yield record
+
+            records = counted(records)
+
+        if format == "zip":
+            with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                # Размер заранее неизвестен: без force_zip64 запись больше 2 ГиБ падает
+                # на закрытии файла («File size too large»), уже после всей выгрузки
+                with zf.open("quests.jsonl", "w", force_zip64=True) as raw:
+                    with TextIOWrapper(raw, encoding="utf-8") as stream:
+                        quest_count = _write_jsonl(stream, records)
+                for path in parchment_files:
+                    zf.write(path, f"parchments/{path.name}")
+                summary = {
+                    "exported_at": datetime.now().isoformat(timespec="seconds"),
+                    "quests": quest_count,
+                    "versions": version_count,
+                    "parchments": len(parchment_files),
+                    "since": since,
+                    "since_version": since_version,
+                    "last_version_id": last_version_id,
+                }
+                zf.writestr("manifest.json", json.dumps(summary, ensure_ascii=False, indent=2))
+        else:
+            with open(output, "w", encoding="utf-8", newline="") as stream:
+                if format == "csv":
+                    quest_count = _write_csv(stream, records, with_versions, with_parchments)
+                else:
+                    quest_count = _write_jsonl(stream, records)
+
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    return {
+        "path": output,
+        "quests": quest_count,
+        "versions": version_count,
+        "parchments": len(parchment_files),
+        "last_version_id": last_version_id,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Экспорт базы квестов в JSONL, CSV или ZIP")
+    parser.add_argument("output", help="Файл выгрузки (.jsonl, .csv или .zip)")
+    parser.add_argument("--format", choices=FORMATS, help="Формат (по умолчанию — по расширению файла)")
+    parser.add_argument("--versions", action="store_true", help="Добавить историю из quest_versions")
+    parser.add_argument("--parchments", action="store_true", help="Добавить готовые пергаменты и карты")
+    parser.add_argument("--since", help="Только квесты с created_at позже (YYYY-MM-DD HH:MM:SS)")
+    parser.add_argument("--since-version", type=int, help="Только квесты, изменённые после версии с этим id")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    summary = export_quests(
+        args.output,
+        format=args.format,
+        with_versions=args.versions,
+        with_parchments=args.parchments,
+        since=args.since,
+        since_version=args.since_version,
+        batch_size=args.batch_size,
+    )
+    print(f"Выгружено квестов: {summary['quests']}, версий: {summary['versions']}, "
+          f"пергаментов: {summary['parchments']} → {summary['path']}")
+    print(f"Для следующей инкрементальной выгрузки: --since-version {summary['last_version_id']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+from typing import Any, Optional
+
+# Маркер «описание ещё не загружено» (None — допустимое значение описания)
+_UNLOADED = object()
+
+
+class Quest:
+    """
+    Компактная запись квеста на __slots__.
+
+    Поддерживает и доступ по атрибутам (quest.title — для шаблонов Jinja2),
+    и словарный (quest["title"], keys(), get() — для экспортёров), так что заменяет
+    прежние dict без изменений в вызывающем коде. Описание может быть не загружено:
+    тогда оно читается из базы при первом обращении (для многих квестов сразу —
+    database.load_descriptions).
+    """
+    __slots__ = ("id", "title", "difficulty", "reward", "_description", "deadline", "created_at")
+
+    FIELDS = ("id", "title", "difficulty", "reward", "description", "deadline", "created_at")
+
+    def __init__(self, id, title, difficulty=None, reward=None, description=_UNLOADED, deadline=None,
+                 created_at=None):
+        self.id = id
+        self.title = title
+        self.difficulty = difficulty
+        self.reward = reward
+        self._description = description
+        self.deadline = deadline
+        self.created_at = created_at
+
+    @property
+    def description(self) -> Optional[str]:
+        if self._description is _UNLOADED:
+            from core.database import get_quest_description
+            self._description = get_quest_description(self.id)
+        return self._description
+
+    @description.setter
+    def description(self, value):
+        self._description = value
+
+    @property
+    def description_loaded(self) -> bool:
+        return self._description is not _UNLOADED
+
+    def keys(self):
+        return self.FIELDS
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    def copy(self) -> "Quest":
+        return Quest(self.id, self.title, self.difficulty, self.reward, self._description,
+                     self.deadline, self.created_at)
+
+    def __repr__(self):
+        return f"Quest(id={self.id!r}, title={self.title!r})"
+
+
+class QuestVersion:
+    """Запись из quest_versions."""
+    __slots__ = ("id", "quest_id", "title", "difficulty", "reward", "description", "created_at")
+
+    def __init__(self, id, quest_id, title, difficulty, reward, description, created_at):
+        self.id = id
+        self.quest_id = quest_id
+        self.title = title
+        self.difficulty = difficulty
+        self.reward = reward
+        self.description = description
+        self.created_at = created_at
+
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def copy(self) -> "QuestVersion":
+        return QuestVersion(*(getattr(self, key) for key in self.__slots__))
+
+    def __repr__(self):
+        return f"QuestVersion(id={self.id!r}, quest_id={self.quest_id!r})"
+
+
+def quest_row_factory(cursor, row) -> Quest:
+    """row_factory для sqlite3: строит Quest по именам колонок запроса."""
+    return Quest(**{column[0]: value for column, value in zip(cursor.description, row)})
+
+
+def version_row_factory(cursor, row) -> QuestVersion:
+    return QuestVersion(**{column[0]: value for column, value in zip(cursor.description, row)})
+
+
+# Объекты карты. Точки хранятся как есть (QPoint из редактора карт).
+
+class MapPath:
+    __slots__ = ("points",)
+    type = "path"
+
+    def __init__(self, points):
+        self.points = points
+
+
+class MapMarker:
+    __slots__ = ("pos", "color")
+    type = "marker"
+
+    def __init__(self, pos, color):
+        self.pos = pos
+        self.color = color
+
+
+class MapText:
+    __slots__ = ("pos", "text")
+    type = "text"
+
+    def __init__(self, pos, text):
+        self.pos = pos
+        self.text = text
@@ -0,0 +1,151 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from core import database
+from core.models import Quest, QuestVersion
+
+MAX_QUESTS = 1024
+MAX_VERSION_LISTS = 256
+
+
+class QuestCache:
+    """
+    Ограниченный LRU-кеш чтения квестов и их последних версий.
+
+    Записи из этого процесса сбрасывают свои ключи сразу (через database.add_write_listener).
+    Записи из других соединений и процессов ловятся по PRAGMA data_version:
+    если значение изменилось с прошлого обращения, кеш очищается целиком.
+
+    Своя запись тоже меняет data_version, поэтому перед ней кеш сверяется с базой,
+    а после — запоминает новое значение: полную очистку вызывают только чужие коммиты.
+    Остаётся узкое окно: чужой коммит, попавший между этими двумя моментами
+    (то есть во время нашей транзакции), будет принят за свой и не сбросит кеш.
+    """
+
+    def __init__(self, max_quests: int = MAX_QUESTS, max_version_lists: int = MAX_VERSION_LISTS,
+                 validate: bool = True):
+        self.max_quests = max_quests
+        self.max_version_lists = max_version_lists
+        self.validate = validate
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._quests: "OrderedDict[int, Quest]" = OrderedDict()
+        self._versions: "OrderedDict[tuple, List[QuestVersion]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_path = None
+        self._data_version = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Своё долгоживущее соединение: data_version имеет смысл только в рамках одного соединения
+        if self._conn is None or self._conn_path != database.DB_PATH:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = sqlite3.connect(database.DB_PATH, check_same_thread=False)
+            self._conn_path = database.DB_PATH
+            self._data_version = None
+            self._clear()
+        return self._conn
+
+    def _clear(self):
+        self._quests.clear()
+        self._versions.clear()
+
+    def _revalidate(self):
+        conn = self._connection()
+        if not self.validate:
+            return
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            if self._data_version is not None and (self._quests or self._versions):
+                self.invalidations += 1
+            self._clear()
+            self._data_version = data_version
+
+    @staticmethod
+    def _put(store: OrderedDict, key, value, limit: int):
+        store[key] = value
+        store.move_to_end(key)
+        if len(store) > limit:
+            store.popitem(last=False)
+
+    def get_quest(self, quest_id: int) -> Optional[Quest]:
+        with self._lock:
+            self._revalidate()
+            quest = self._quests.get(quest_id)
+            if quest is not None:
+                self._quests.move_to_end(quest_id)
+                self.hits += 1
+                return quest.copy()
+            self.misses += 1
+            quest = database._select_quest(self._connection(), quest_id)
+            if quest is not None:
+                self._put(self._quests, quest_id, quest, self.max_quests)
+                return quest.copy()
+            return None
+
+    def get_recent_versions(self, quest_id: int, limit: int = 5) -> List[QuestVersion]:
+        key = (quest_id, limit)
+        with self._lock:
+            self._revalidate()
+            versions = self._versions.get(key)
+            if versions is not None:
+                self._versions.move_to_end(key)
+                self.hits += 1
+                return [v.copy() for v in versions]
+            self.misses += 1
+            versions = database._select_recent_versions(self._connection(), quest_id, limit)
+            self._put(self._versions, key, versions, self.max_version_lists)
+            return [v.copy() for v in versions]
+
+    def before_write(self):
+        """Перед своей записью: учесть чужие коммиты, пока их ещё можно отличить от своего."""
+        with self._lock:
+            if self._conn is not None:
+                self._revalidate()
+
+    def invalidate(self, quest_ids: Iterable[int]):
+        with self._lock:
+            removed = False
+            for quest_id in quest_ids:
+                removed |= self._quests.pop(quest_id, None) is not None
+                for key in [k for k in self._versions if k[0] == quest_id]:
+                    del self._versions[key]
+                    removed = True
+            if removed:
+                self.invalidations += 1
+            # Изменения своей записи уже сброшены по ключам — запоминаем data_version после неё
+            if self.validate and self._conn is not None and self._conn_path == database.DB_PATH \
+                    and self._data_version is not None:
+                self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "quests": len(self._quests),
+                "version_lists": len(self._versions),
+            }
+
+
+quest_cache = QuestCache()
+database.add_write_listener(quest_cache.invalidate, before_write=quest_cache.before_write)
+
+
+def get_quest(quest_id: int) -> Optional[Quest]:
+    return quest_cache.get_quest(quest_id)
+
+
+def get_recent_versions(quest_id: int, limit: int = 5) -> List[QuestVersion]:
+    return quest_cache.get_recent_versions(quest_id, limit)
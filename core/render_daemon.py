@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# По умолчанию — в корне проекта, чтобы клиент из любого рабочего каталога нашёл демон
+SOCKET_PATH = Path(os.environ.get(
+    "QUEST_MASTER_RENDER_SOCKET", Path(__file__).parent.parent / "render_daemon.sock"
+)).resolve()
+WORKERS = 2
+QUEUE_SIZE = 32
+CLIENT_TIMEOUT = 120
+
+
+class UnknownTemplate(ValueError):
+    """Шаблона нет среди каталогов демона (например, он из пользовательского каталога клиента)."""
+
+
+def warm_up():
+    """Импорт тяжёлых модулей, компиляция шаблонов и пробный рендер (поиск шрифтов)."""
+    from weasyprint import HTML
+    from core import template_engine
+
+    sample = {"id": 0, "title": "", "difficulty": "", "reward": 0, "description": "", "deadline": ""}
+    for name in template_engine.TEMPLATES:
+        html = template_engine.render_template(name, {"quest": sample, "current_date": ""})
+        HTML(string=html).write_pdf()
+    import docx  # noqa: F401
+
+
+def render_request(request: Dict[str, Any]) -> str:
+    """Рендерит один запрос; выполняется в процессе-воркере."""
+    from jinja2 import TemplateNotFound
+    from core import template_engine
+    from core.quest_cache import get_quest
+
+    quest = request.get("quest")
+    if quest is None:
+        quest = get_quest(request["quest_id"])
+        if quest is None:
+            raise ValueError(f"Квест #{request['quest_id']} не найден")
+    template = request.get("template", "royal_decree.html")
+    try:
+        path = template_engine.render_local(
+            quest,
+            format=request.get("format", "pdf"),
+            template=template,
+            with_qr=request.get("with_qr", False),
+        )
+    except TemplateNotFound:
+        raise UnknownTemplate(template) from None
+    return str(Path(path).resolve())
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class RenderDaemon:
+    """
+    Долгоживущий сервис рендеринга пергаментов.
+
+    Рендерит в пуле процессов: вёрстка WeasyPrint — чистый Python и упирается в GIL,
+    так что потоки параллелизма не дают. Каждый процесс один раз прогревает WeasyPrint,
+    шрифты и шаблоны, а демон принимает запросы по Unix-сокету
+    (одна JSON-строка на запрос, одна JSON-строка в ответ).
+    """
+
+    _render = staticmethod(render_request)
+
+    def __init__(self, socket_path: Path = SOCKET_PATH, workers: int = WORKERS, queue_size: int = QUEUE_SIZE):
+        self.socket_path = Path(socket_path)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.started_at = time.time()
+        self.stats = {
+            "requests": 0,
+            "rendered": 0,
+            "failed": 0,
+            "rejected": 0,
+            "render_seconds": 0.0,
+        }
+        self._queue: Optional[asyncio.Queue] = None
+        self._pool = None
+        self._in_flight = 0
+
+    def _create_pool(self):
+        # spawn, а не fork: у демона уже работают поток цикла событий и сокет
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=warm_up)
+
+    def warm_up(self):
+        """Запускает процессы пула и дожидается их прогрева, чтобы первый запрос не ждал."""
+        list(self._pool.map(_ping, range(self.workers)))
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            request, future = await self._queue.get()
+            self._in_flight += 1
+            start = time.perf_counter()
+            try:
+                path = await loop.run_in_executor(self._pool, self._render, request)
+                self.stats["rendered"] += 1
+                future.set_result({"ok": True, "path": path})
+            except UnknownTemplate as e:
+                self.stats["failed"] += 1
+                future.set_result({"ok": False, "error": "unknown_template", "template": str(e)})
+            except Exception as e:
+                self.stats["failed"] += 1
+                future.set_result({"ok": False, "error": str(e)})
+            finally:
+                self.stats["render_seconds"] += time.perf_counter() - start
+                self._in_flight -= 1
+                self._queue.task_done()
+
+    def _health(self) -> Dict[str, Any]:
+        return {"ok": True, "status": "ready", "pid": os.getpid(), "uptime": round(time.time() - self.started_at, 1)}
+
+    def _stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        done = stats["rendered"] + stats["failed"]
+        stats["avg_render_ms"] = round(stats["render_seconds"] / done * 1000, 1) if done else 0.0
+        stats.update(ok=True, queued=self._queue.qsize(), in_flight=self._in_flight,
+                     workers=self.workers, queue_size=self.queue_size)
+        return stats
+
+    async def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op", "render")
+        if op == "health":
+            return self._health()
+        if op == "stats":
+            return self._stats()
+        if op != "render":
+            return {"ok": False, "error": f"Неизвестная операция: {op}"}
+
+        self.stats["requests"] += 1
+        # Очередь полна — сразу отказываем, клиент отрендерит сам
+        if self._queue.full():
+            self.stats["rejected"] += 1
+            return {"ok": False, "error": "busy"}
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((request, future))
+        return await future
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self._dispatch(json.loads(line))
+                except (ValueError, KeyError) as e:
+                    response = {"ok": False, "error": f"Некорректный запрос: {e}"}
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if self.socket_path.exists():
+            if daemon_available(self.socket_path):
+                raise RuntimeError(f"Демон уже запущен: {self.socket_path}")
+            self.socket_path.unlink()
+
+        self._pool = self._create_pool()
+        self.warm_up()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+        server = await asyncio.start_unix_server(self._handle_client, path=str(self.socket_path))
+        print(f"Демон рендеринга слушает {self.socket_path} (воркеров: {self.workers})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+
+def send_request(payload: Dict[str, Any], socket_path: Optional[Path] = None,
+                 timeout: float = CLIENT_TIMEOUT) -> Dict[str, Any]:
+    """Отправляет один запрос демону и возвращает его ответ."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path or SOCKET_PATH))
+        sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("Демон рендеринга закрыл соединение")
+            data += chunk
+    return json.loads(data)
+
+
+def daemon_available(socket_path: Optional[Path] = None) -> bool:
+    socket_path = Path(socket_path or SOCKET_PATH)
+    if not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return False
+    try:
+        return send_request({"op": "health"}, socket_path, timeout=1).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+
+def render_via_daemon(quest_data: Dict[str, Any], format: str, template: str, with_qr: bool) -> Optional[Path]:
+    """
+    Рендерит документ через демон, если он запущен.
+
+    Возвращает None, когда демона нет, он перегружен или не знает шаблона (шаблоны
+    из QUEST_MASTER_TEMPLATE_DIRS клиента демону не видны), — тогда рендерим в своём процессе.
+    Ошибки самого рендеринга пробрасываются как RuntimeError.
+    """
+    if not hasattr(socket, "AF_UNIX") or not SOCKET_PATH.exists():
+        return None
+    payload = {
+        "op": "render",
+        "quest": {key: quest_data[key] for key in quest_data.keys()},
+        "format": format,
+        "template": template,
+        "with_qr": with_qr,
+    }
+    try:
+        response = send_request(payload)
+    except (OSError, ValueError):
+        return None
+    if response.get("ok"):
+        return Path(response["path"])
+    if response.get("error") in ("busy", "unknown_template"):
+        return None
+    raise RuntimeError(response.get("error", "Ошибка демона рендеринга"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Демон рендеринга пергаментов")
+    parser.add_argument("--socket", type=Path, default=SOCKET_PATH)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Число процессов рендеринга")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--stats", action="store_true", help="Показать статистику запущенного демона")
+    parser.add_argument("--health", action="store_true", help="Проверить, что демон отвечает")
+    args = parser.parse_args(argv)
+
+    if args.stats or args.health:
+        response = send_request({"op": "stats" if args.stats else "health"}, args.socket, timeout=5)
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+        return
+
+    daemon = RenderDaemon(args.socket, args.workers, args.queue_size)
+    try:
+        asyncio.run(daemon.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import argparse
+import multiprocessing
+import random
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+from core import database
+
+MODES = ("thread", "process")
+VIA = ("direct", "queue", "remote")
+DIFFICULTIES = ("Лёгкий", "Средний", "Сложный", "Олимпийский")
+DESCRIPTION = " ".join(["Квест нагрузочного стенда."] * 20)
+
+
+def _writer_worker(db_path, via, socket_path, duration, worker_id) -> Dict[str, Any]:
+    database.DB_PATH = Path(db_path)
+    if via == "queue":
+        from core.writer import get_writer
+        save = get_writer().save
+    elif via == "remote":
+        from core.writer import RemoteQuestWriter
+        try:
+            client = RemoteQuestWriter(socket_path)
+        except OSError:
+            # Не достучались до процесса-писателя — это ошибка воркера, а не падение стенда
+            return {"latencies": [], "errors": 1, **database.write_stats}
+        save = client.save
+    else:
+        save = database.save_quest
+
+    prefix = f"stress-{uuid.uuid4().hex[:8]}-{worker_id}"
+    latencies, errors = [], 0
+    stop_at = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        try:
+            save(f"{prefix}-{i}", DIFFICULTIES[i % 4], 100 + i, DESCRIPTION, "2025-12-31 23:59:59")
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            errors += 1
+        i += 1
+    if via == "remote":
+        client.close()
+    return {"latencies": latencies, "errors": errors, **database.write_stats}
+
+
+def _reader_worker(db_path, duration, worker_id) -> Dict[str, Any]:
+    database.DB_PATH = Path(db_path)
+    latencies, errors = [], 0
+    rng = random.Random(worker_id)
+    conn = sqlite3.connect(database.DB_PATH, timeout=database.BUSY_TIMEOUT)
+    max_id = 1
+    stop_at = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < stop_at:
+        try:
+            if i % 100 == 0:
+                max_id = conn.execute("SELECT COALESCE(MAX(id), 1) FROM quests").fetchone()[0]
+            started = time.perf_counter()
+            conn.execute("SELECT * FROM quests WHERE id = ?", (rng.randint(1, max_id),)).fetchone()
+            latencies.append(time.perf_counter() - started)
+        except sqlite3.Error:
+            errors += 1
+        i += 1
+    conn.close()
+    return {"latencies": latencies, "errors": errors}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _summary(results: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    latencies = [x for r in results for x in r["latencies"]]
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / duration, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 2),
+        "errors": sum(r["errors"] for r in results),
+    }
+
+
+def _writer_ready(socket_path) -> bool:
+    from core.writer import RemoteQuestWriter
+    try:
+        client = RemoteQuestWriter(socket_path, timeout=1)
+    except OSError:
+        return False
+    try:
+        return client.request({"op": "health"}).get("ok", False)
+    except (OSError, ValueError):
+        return False
+    finally:
+        client.close()
+
+
+def _start_writer_process(db_path, socket_path):
+    # Сокет от прошлого аварийного запуска не должен сойти за готовый сервер
+    if Path(socket_path).exists() and not _writer_ready(socket_path):
+        Path(socket_path).unlink()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "core.writer", "--db", str(db_path), "--socket", str(socket_path)],
+        cwd=Path(__file__).parent.parent,
+        stdout=subprocess.DEVNULL,
+    )
+    for _ in range(250):
+        if process.poll() is not None:
+            break
+        if _writer_ready(socket_path):
+            return process
+        time.sleep(0.02)
+    _stop_writer_process(process)
+    raise RuntimeError("Процесс-писатель не запустился")
+
+
+def _stop_writer_process(process):
+    # SIGINT, а не SIGTERM: сервер корректно завершается и удаляет свой сокет
+    if process.poll() is None:
+        process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def run(writers: int = 4, readers: int = 2, mode: str = "thread", via: str = "direct",
+        duration: float = 3.0, db_path=None, socket_path=None) -> Dict[str, Any]:
+    """
+    Запускает писателей и читателей против одной базы и возвращает отчёт:
+    пропускную способность, задержки (p50/p95/p99/max), ожидание блокировки и число повторов.
+    """
+    if mode not in MODES or via not in VIA:
+        raise ValueError(f"mode: {MODES}, via: {VIA}")
+    # Абсолютный путь: процесс-писатель запускается с другим рабочим каталогом
+    db_path = Path(db_path or database.DB_PATH).resolve()
+    socket_path = Path(socket_path or db_path.with_suffix(".writer.sock"))
+    database.DB_PATH = db_path
+    database.init_db()
+
+    writer_process = _start_writer_process(db_path, socket_path) if via == "remote" else None
+    jobs = [(_writer_worker, (str(db_path), via, str(socket_path), duration, i)) for i in range(writers)]
+    jobs += [(_reader_worker, (str(db_path), duration, i)) for i in range(readers)]
+
+    stats_before = dict(database.write_stats)
+    try:
+        started = time.perf_counter()
+        if mode == "process":
+            with multiprocessing.get_context("spawn").Pool(len(jobs)) as pool:
+                pending = [pool.apply_async(fn, args) for fn, args in jobs]
+                results = [p.get() for p in pending]
+        else:
+            results = [None] * len(jobs)
+
+            def target(index, fn, args):
+                results[index] = fn(*args)
+
+            threads = [threading.Thread(target=target, args=(i, fn, args)) for i, (fn, args) in enumerate(jobs)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        elapsed = time.perf_counter() - started
+
+        writer_stats = None
+        if via == "remote":
+            from core.writer import RemoteQuestWriter
+            client = RemoteQuestWriter(socket_path)
+            writer_stats = client.request({"op": "stats"})
+            client.close()
+        elif via == "queue" and mode == "thread":
+            from core.writer import get_writer
+            writer_stats = get_writer().get_stats()
+    finally:
+        if writer_process is not None:
+            _stop_writer_process(writer_process)
+
+    write_results = results[:writers]
+    if via == "remote":
+        lock_wait, retries = writer_stats["lock_wait_seconds"], writer_stats["retries"]
+    elif mode == "process":
+        # У каждого процесса-воркера свои счётчики записи
+        lock_wait = sum(r["lock_wait_seconds"] for r in write_results)
+        retries = sum(r["retries"] for r in write_results)
+    else:
+        lock_wait = database.write_stats["lock_wait_seconds"] - stats_before["lock_wait_seconds"]
+        retries = database.write_stats["retries"] - stats_before["retries"]
+
+    return {
+        "mode": mode,
+        "via": via,
+        "writers": writers,
+        "readers": readers,
+        "duration": round(elapsed, 2),
+        # Каждый воркер работает ровно duration секунд; elapsed включает ещё и запуск процессов
+        "writes": _summary(write_results, duration),
+        "reads": _summary(results[writers:], duration),
+        "lock_wait_seconds": round(lock_wait, 3),
+        "retries": retries,
+        "writer": writer_stats,
+    }
+
+
+def _print_report(report: Dict[str, Any]):
+    print(f"Режим: {report['mode']}, запись через {report['via']}, "
+          f"писателей: {report['writers']}, читателей: {report['readers']}, {report['duration']} с")
+    for name in ("writes", "reads"):
+        s = report[name]
+        print(f"  {name:6}: {s['ops']} опер. ({s['ops_per_sec']}/с), p50 {s['p50_ms']} мс, "
+              f"p95 {s['p95_ms']} мс, p99 {s['p99_ms']} мс, max {s['max_ms']} мс, ошибок: {s['errors']}")
+    print(f"  ожидание блокировки: {report['lock_wait_seconds']} с, повторов: {report['retries']}")
+    if report["writer"]:
+        print(f"  групповой коммит: {report['writer']['batches']} транзакций, "
+              f"в среднем {report['writer']['avg_batch']} квестов")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Нагрузочный стенд: несколько писателей и читателей на одной базе")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--mode", choices=MODES, default="thread")
+    parser.add_argument("--via", choices=VIA, default="direct",
+                        help="direct — save_quest, queue — писатель процесса, remote — отдельный процесс-писатель")
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--db", type=Path, default=Path("stress_quests.db"))
+    args = parser.parse_args(argv)
+
+    _print_report(run(args.writers, args.readers, args.mode, args.via, args.duration, args.db))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,40 @@
 import os
+import uuid
 import qrcode
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any
 
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML
-from docx import Document
-from docx.shared import Inches
+from core.template_env import TEMPLATES_DIR, get_environment
 
+# weasyprint и python-docx импортируются лениво: когда запущен демон рендеринга,
+# процессу-клиенту они не нужны вовсе
 
-TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
-PARCHMENTS_DIR = Path("./parchments")
+TEMPLATES = ("royal_decree.html", "guild_contract.html", "ancient_scroll.html")
+# Относительно корня проекта, а не рабочего каталога: GUI, скрипты и демон рендеринга
+# должны писать в одно место, откуда бы их ни запустили
+PARCHMENTS_DIR = Path(__file__).parent.parent / "parchments"
 PARCHMENTS_DIR.mkdir(exist_ok=True)
 
-# Jinja2 окружение
-env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+
+def _output_stem(quest_id) -> str:
+    """Уникальное имя файла: демон рендерит параллельно, и одна секунда в имени не спасает от коллизий."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{quest_id}_{timestamp}_{uuid.uuid4().hex[:8]}"
 
 
 def render_template(template_name: str, context: Dict[str, Any]) -> str:
-    template = env.get_template(template_name)
+    # Окружение с дисковым кешем байткода и предкомпилированными шаблонами (core/template_env.py)
+    template = get_environment().get_template(template_name)
     return template.render(**context)
 
 
 def export_to_pdf(quest_data: Dict[str, Any], template: str = "royal_decree.html", with_qr: bool = False) -> Path:
     """Экспортирует квест в PDF с опциональным QR-кодом."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{quest_data['id']}_{timestamp}.pdf"
+    from weasyprint import HTML
+
+    stem = _output_stem(quest_data['id'])
+    filename = f"{stem}.pdf"
     output_path = PARCHMENTS_DIR / filename
 
     context = {
@@ -40,7 +48,7 @@ def export_to_pdf(quest_data: Dict[str, Any], template: str = "royal_decree.html
         # Генерируем URL квеста
         url = f"http://quest.local/view/{quest_data['id']}"
         qr = qrcode.make(url)
-        qr_filename = f"qr_{quest_data['id']}_{timestamp}.png"
+        qr_filename = f"qr_{stem}.png"
         qr_path = PARCHMENTS_DIR / qr_filename
         qr.save(qr_path)
 
@@ -60,8 +68,11 @@ def export_to_pdf(quest_data: Dict[str, Any], template: str = "royal_decree.html
 
 def export_to_docx(quest_data: Dict[str, Any], template: str = "guild_contract.html", with_qr: bool = False) -> Path:
     """Экспортирует квест в DOCX с опциональным QR-кодом."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{quest_data['id']}_{timestamp}.docx"
+    from docx import Document
+    from docx.shared import Inches
+
+    stem = _output_stem(quest_data['id'])
+    filename = f"{stem}.docx"
     output_path = PARCHMENTS_DIR / filename
 
     doc = Document()
@@ -76,7 +87,7 @@ def export_to_docx(quest_data: Dict[str, Any], template: str = "guild_contract.h
     if with_qr:
         url = f"http://quest.local/view/{quest_data['id']}"
         qr = qrcode.make(url)
-        qr_path = PARCHMENTS_DIR / f"qr_docx_{quest_data['id']}_{timestamp}.png"
+        qr_path = PARCHMENTS_DIR / f"qr_docx_{stem}.png"
         qr.save(qr_path)
         doc.add_paragraph("QR-код квеста:")
         doc.add_picture(str(qr_path), width=Inches(1.5))
@@ -86,12 +97,24 @@ def export_to_docx(quest_data: Dict[str, Any], template: str = "guild_contract.h
     return output_path
 
 
+def render_local(quest_data: Dict[str, Any], format: str = "pdf", template: str = "royal_decree.html", with_qr: bool = False) -> Path:
+    """Рендерит документ в текущем процессе."""
+    if format == "pdf":
+        return export_to_pdf(quest_data, template, with_qr)
+    elif format == "docx":
+        return export_to_docx(quest_data, template, with_qr)
+    else:
+        raise ValueError("Поддерживаемые форматы: 'pdf', 'docx'")
+
+
 class TemplateEngine:
     @staticmethod
     def export(quest_data: Dict[str, Any], format: str = "pdf", template: str = "royal_decree.html", with_qr: bool = False):
-        if format == "pdf":
-            return export_to_pdf(quest_data, template, with_qr)
-        elif format == "docx":
-            return export_to_docx(quest_data, template, with_qr)
-        else:
-            raise ValueError("Поддерживаемые форматы: 'pdf', 'docx'")
\ No newline at end of file
+        if format not in ("pdf", "docx"):
+            raise ValueError("Поддерживаемые форматы: 'pdf', 'docx'")
+        # Если запущен демон рендеринга — отдаём работу ему (WeasyPrint там уже прогрет)
+        from core.render_daemon import render_via_daemon
+        path = render_via_daemon(quest_data, format, template, with_qr)
+        if path is not None:
+            return path
+        return render_local(quest_data, format, template, with_qr)
\ No newline at end of file
@@ -0,0 +1,161 @@
+import argparse
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from jinja2 import ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, ModuleLoader
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+CACHE_DIR = Path(os.environ.get("QUEST_MASTER_CACHE_DIR", Path.home() / ".cache" / "quest_master"))
+BYTECODE_DIR = CACHE_DIR / "jinja_bytecode"
+PRECOMPILED_DIR = CACHE_DIR / "precompiled_templates"
+STAMP_FILE = "templates.stamp"
+
+# Дополнительные каталоги шаблонов пользователя (через os.pathsep); они важнее встроенных
+USER_TEMPLATE_DIRS = [
+    Path(p) for p in os.environ.get("QUEST_MASTER_TEMPLATE_DIRS", "").split(os.pathsep) if p
+]
+
+_env: Optional[Environment] = None
+_env_fingerprint: Optional[str] = None
+_lock = threading.Lock()
+
+
+def _fingerprint(directory: Path) -> str:
+    """Отпечаток каталога шаблонов: имена, размеры и время изменения файлов."""
+    digest = hashlib.sha1()
+    for path in sorted(directory.glob("*.html")):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def template_dirs() -> List[Path]:
+    """Каталоги шаблонов в порядке поиска: пользовательские, затем встроенный."""
+    return [*USER_TEMPLATE_DIRS, TEMPLATES_DIR]
+
+
+def _sources_fingerprint() -> str:
+    return "|".join(f"{d}={_fingerprint(d)}" for d in template_dirs())
+
+
+def _precompiled_is_fresh() -> bool:
+    stamp = PRECOMPILED_DIR / STAMP_FILE
+    try:
+        return stamp.read_text(encoding="utf-8") == _fingerprint(TEMPLATES_DIR)
+    except OSError:
+        return False
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    try:
+        BYTECODE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(str(BYTECODE_DIR))
+
+
+def build_environment(user_dirs: Optional[Iterable[Path]] = None) -> Environment:
+    """
+    Собирает окружение Jinja2.
+
+    Порядок поиска: каталоги пользователя (с горячей перезагрузкой по mtime),
+    предкомпилированные встроенные шаблоны (если они свежие), исходники встроенных шаблонов.
+    Скомпилированный байткод шаблонов кешируется на диске между процессами.
+    """
+    user_dirs = USER_TEMPLATE_DIRS if user_dirs is None else list(user_dirs)
+    loaders = [FileSystemLoader(str(d)) for d in user_dirs]
+    if _precompiled_is_fresh():
+        loaders.append(ModuleLoader(str(PRECOMPILED_DIR)))
+    loaders.append(FileSystemLoader(str(TEMPLATES_DIR)))
+    return Environment(
+        loader=ChoiceLoader(loaders),
+        bytecode_cache=_bytecode_cache(),
+        auto_reload=True,
+    )
+
+
+def get_environment() -> Environment:
+    """
+    Общее окружение процесса.
+
+    auto_reload Jinja2 замечает только правку уже загруженного шаблона из FileSystemLoader:
+    не видит новый пользовательский шаблон, перекрывающий встроенный, и никогда не перезагружает
+    предкомпилированные (ModuleLoader). Поэтому окружение пересобирается, как только меняется
+    отпечаток каталогов шаблонов (байткод на диске делает пересборку дешёвой).
+    """
+    global _env, _env_fingerprint
+    fingerprint = _sources_fingerprint()
+    if _env is None or fingerprint != _env_fingerprint:
+        with _lock:
+            if _env is None or fingerprint != _env_fingerprint:
+                _env = build_environment()
+                _env_fingerprint = fingerprint
+    return _env
+
+
+def add_template_dir(directory) -> None:
+    """Подключает каталог пользовательских шаблонов к уже работающему процессу."""
+    global _env
+    directory = Path(directory)
+    with _lock:
+        if directory not in USER_TEMPLATE_DIRS:
+            USER_TEMPLATE_DIRS.insert(0, directory)
+        _env = None
+
+
+def list_templates() -> List[str]:
+    """Имена всех доступных шаблонов: пользовательских и встроенных."""
+    names = set()
+    for directory in template_dirs():
+        if directory.is_dir():
+            names.update(p.name for p in directory.glob("*.html"))
+    return sorted(names)
+
+
+def precompile_templates() -> Path:
+    """Компилирует встроенные шаблоны в Python-модули для ModuleLoader."""
+    global _env
+    PRECOMPILED_DIR.mkdir(parents=True, exist_ok=True)
+    source_env = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)))
+    source_env.compile_templates(str(PRECOMPILED_DIR), zip=None, ignore_errors=False)
+    (PRECOMPILED_DIR / STAMP_FILE).write_text(_fingerprint(TEMPLATES_DIR), encoding="utf-8")
+    with _lock:
+        _env = None
+    return PRECOMPILED_DIR
+
+
+def generate(template_name: str, context: Dict[str, Any]) -> Iterator[str]:
+    """Отдаёт результат рендеринга по частям через Template.generate."""
+    return get_environment().get_template(template_name).generate(**context)
+
+
+def render_to_stream(template_name: str, context: Dict[str, Any], output) -> None:
+    """
+    Рендерит шаблон прямо в файл или поток, не собирая документ в одну строку.
+
+    Подходит для больших документов на много квестов (context может содержать генератор).
+    """
+    if isinstance(output, (str, Path)):
+        with open(output, "w", encoding="utf-8") as f:
+            f.writelines(generate(template_name, context))
+    else:
+        output.writelines(generate(template_name, context))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Управление кешем шаблонов")
+    parser.add_argument("--precompile", action="store_true", help="Предкомпилировать встроенные шаблоны")
+    args = parser.parse_args(argv)
+
+    if args.precompile:
+        print(f"Шаблоны скомпилированы в {precompile_templates()}")
+    else:
+        print(f"Предкомпилированные шаблоны актуальны: {'да' if _precompiled_is_fresh() else 'нет'}")
+        print("Доступные шаблоны: " + ", ".join(list_templates()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core import database
+
+# По умолчанию — в корне проекта, чтобы клиенты из любого рабочего каталога нашли процесс-писатель
+SOCKET_PATH = Path(os.environ.get(
+    "QUEST_MASTER_WRITER_SOCKET", Path(__file__).parent.parent / "quest_writer.sock"
+)).resolve()
+MAX_BATCH = 256     # не больше стольких квестов в одной транзакции
+LINGER = 0.002      # сколько ждать попутчиков для группового коммита, сек
+
+_STOP = object()
+
+
+def _check_quest_args(title, difficulty, reward, description, deadline):
+    """Отсекает значения, которые sqlite3 не сможет привязать (например, список из JSON)."""
+    for name, value, types in (
+        ("title", title, (str,)),
+        ("difficulty", difficulty, (str, type(None))),
+        ("reward", reward, (int, type(None))),
+        ("description", description, (str, type(None))),
+        ("deadline", deadline, (str, type(None))),
+    ):
+        if not isinstance(value, types) or isinstance(value, bool):
+            raise TypeError(f"Недопустимое значение поля {name}: {value!r}")
+
+
+class QuestWriter:
+    """
+    Единственный писатель квестов в процессе.
+
+    Запросы со всех потоков попадают в одну очередь, а фоновый поток забирает их пачками
+    и фиксирует каждую пачку одной транзакцией (групповой коммит). Ошибка одного квеста
+    (например, недопустимая сложность) откатывается до точки сохранения и не роняет остальные.
+    """
+
+    def __init__(self, max_batch: int = MAX_BATCH, linger: float = LINGER):
+        self.max_batch = max_batch
+        self.linger = linger
+        self.stats = {"batches": 0, "quests": 0, "failed": 0}
+        self._queue: "queue.Queue" = queue.Queue()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_path = None
+        self._thread = threading.Thread(target=self._run, name="quest-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, title, difficulty, reward, description, deadline) -> Future:
+        _check_quest_args(title, difficulty, reward, description, deadline)
+        future = Future()
+        self._queue.put(((title, difficulty, reward, description, deadline), future))
+        return future
+
+    def save(self, title, difficulty, reward, description, deadline) -> int:
+        """То же, что database.save_quest, но через общую очередь записи."""
+        return self.submit(title, difficulty, reward, description, deadline).result()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._conn_path != database.DB_PATH:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = database.connect_for_write()
+            self._conn_path = database.DB_PATH
+        return self._conn
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+        if self._conn is not None:
+            self._conn.close()
+
+    def _commit(self, batch):
+        def work(cur):
+            results = []
+            for args, future in batch:
+                cur.execute("SAVEPOINT quest")
+                try:
+                    quest_id = database._upsert_quest(cur, *args)
+                except sqlite3.Error as e:
+                    # Занятая база — повод повторить всю транзакцию, а не ошибка квеста
+                    if isinstance(e, sqlite3.OperationalError) and database._is_busy(e):
+                        raise
+                    cur.execute("ROLLBACK TO quest")
+                    cur.execute("RELEASE quest")
+                    results.append((future, None, e))
+                    continue
+                cur.execute("RELEASE quest")
+                results.append((future, quest_id, None))
+            return results
+
+        try:
+            results = database.run_write_transaction(self._connection(), work)
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.stats["batches"] += 1
+        saved = [quest_id for _, quest_id, error in results if error is None]
+        self.stats["quests"] += len(saved)
+        self.stats["failed"] += len(results) - len(saved)
+        database._notify_written(saved)
+        for future, quest_id, error in results:
+            if error is None:
+                future.set_result(quest_id)
+            else:
+                future.set_exception(error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["avg_batch"] = round(stats["quests"] / stats["batches"], 1) if stats["batches"] else 0.0
+        stats["pending"] = self._queue.qsize()
+        stats.update(database.write_stats)
+        return stats
+
+
+_writer: Optional[QuestWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> QuestWriter:
+    """Общий писатель процесса (создаётся при первом обращении)."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = QuestWriter()
+    return _writer
+
+
+class WriterServer:
+    """
+    Локальный процесс-писатель: принимает квесты от других процессов по Unix-сокету
+    (одна JSON-строка на запрос) и пишет их через свой QuestWriter. Так все экземпляры
+    Quest Master и пакетные скрипты получают групповой коммит на общую базу.
+    """
+
+    def __init__(self, socket_path: Path = SOCKET_PATH, writer: Optional[QuestWriter] = None):
+        self.socket_path = Path(socket_path)
+        self.writer = writer or get_writer()
+
+    async def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op", "save")
+        if op == "health":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "stats":
+            return {"ok": True, **self.writer.get_stats()}
+        if op != "save":
+            return {"ok": False, "error": f"Неизвестная операция: {op}"}
+        try:
+            quest_id = await asyncio.wrap_future(self.writer.submit(*request["quest"]))
+        except sqlite3.Error as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "id": quest_id}
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self._dispatch(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {"ok": False, "error": f"Некорректный запрос: {e}"}
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if self.socket_path.exists():
+            try:
+                RemoteQuestWriter(self.socket_path, timeout=1).close()
+            except OSError:
+                self.socket_path.unlink()
+            else:
+                raise RuntimeError(f"Процесс-писатель уже запущен: {self.socket_path}")
+        server = await asyncio.start_unix_server(self._handle_client, path=str(self.socket_path))
+        print(f"Процесс-писатель слушает {self.socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+
+class RemoteQuestWriter:
+    """Клиент процесса-писателя; одно соединение на экземпляр (не разделять между потоками)."""
+
+    def __init__(self, socket_path: Optional[Path] = None, timeout: float = 30):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(str(socket_path or SOCKET_PATH))
+        self._file = self._sock.makefile("rb")
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Процесс-писатель закрыл соединение")
+        return json.loads(line)
+
+    def save(self, title, difficulty, reward, description, deadline) -> int:
+        response = self.request({"op": "save", "quest": [title, difficulty, reward, description, deadline]})
+        if not response.get("ok"):
+            raise sqlite3.DatabaseError(response.get("error"))
+        return response["id"]
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Процесс-писатель базы квестов")
+    parser.add_argument("--socket", type=Path, default=SOCKET_PATH)
+    parser.add_argument("--db", type=Path, help="Файл базы (по умолчанию quests.db)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--linger", type=float, default=LINGER)
+    args = parser.parse_args(argv)
+
+    if args.db:
+        database.DB_PATH = args.db
+    database.init_db()
+    server = WriterServer(args.socket, QuestWriter(args.max_batch, args.linger))
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
-from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTabWidget
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTabWidget, QMessageBox
 from gui.quest_wizard import QuestWizard
 from gui.map_editor import MapEditor
 from gui.gamification_panel import GamificationPanel
+from gui.quest_browser import QuestBrowser
+from core.quest_cache import get_quest
 
 
 class MainWindow(QMainWindow):
@@ -16,12 +18,17 @@ class MainWindow(QMainWindow):
         self.map_editor = MapEditor()
         self.map_editor.main_window_ref = self
         self.gamification_panel = GamificationPanel()
+        self.quest_browser = QuestBrowser()
+        # Только явное открытие (двойной клик / Enter): простое перемещение по таблице
+        # не должно затирать поля мастера
+        self.quest_browser.quest_activated.connect(self.show_quest_in_wizard)
 
         # Центральный виджет с вкладками
         central = QWidget()
         layout = QVBoxLayout()
         self.tabs = QTabWidget()
         self.tabs.addTab(self.quest_wizard, "🧙 Создать квест")
+        self.tabs.addTab(self.quest_browser, "📜 Архив квестов")
         self.tabs.addTab(self.map_editor, "🗺️ Редактор карт")
         self.tabs.addTab(self.gamification_panel, "🏆 Геймификация")
         layout.addWidget(self.tabs)
@@ -32,13 +39,37 @@ class MainWindow(QMainWindow):
         self.tabs.currentChanged.connect(self.on_tab_changed)
 
     def on_tab_changed(self, index):
-        if index == 1:
+        widget = self.tabs.widget(index)
+        if widget is self.map_editor:
             quest_id = self.quest_wizard.current_quest_id
             if quest_id is not None:
                 self.map_editor.set_quest_id(quest_id)
-        elif index == 2:  # GamificationPanel
+        elif widget is self.quest_browser:
+            self.quest_browser.refresh_if_stale()
+        elif widget is self.gamification_panel:
             self.gamification_panel.update_display()
 
+    def open_quest(self, quest_id):
+        """Загружает квест из архива в мастер и редактор карт. Возвращает True, если загрузил."""
+        quest = get_quest(quest_id)
+        if quest is None:
+            return False
+        if self.quest_wizard.has_unsaved_draft:
+            answer = QMessageBox.question(
+                self, "Несохранённый черновик",
+                "Черновик в мастере ещё не сохранён (нужно название и описание от 50 слов). "
+                "Открыть квест и потерять его?"
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                return False
+        self.quest_wizard.load_quest(quest)
+        self.map_editor.set_quest_id(quest_id)
+        return True
+
+    def show_quest_in_wizard(self, quest_id):
+        if self.open_quest(quest_id):
+            self.tabs.setCurrentWidget(self.quest_wizard)
+
     def notify_xp_earned(self):
         if hasattr(self, 'gamification_panel'):
             self.gamification_panel.refresh()
\ No newline at end of file
@@ -9,6 +9,7 @@ from PyQt6.QtGui import (
 from PyQt6.QtCore import Qt, QPoint, QRectF
 from pathlib import Path
 from core.gamification import GamificationManager
+from core.models import MapPath, MapMarker, MapText
 
 
 class MapScene:
@@ -45,20 +46,20 @@ class MapScene:
 
         # Отрисовка всех объектов
         for obj in self.objects:
-            if obj["type"] == "path":
+            if obj.type == "path":
                 pen = QPen(QColor("#8B4513"), 3)
                 painter.setPen(pen)
-                painter.drawPolyline(obj["points"])
-            elif obj["type"] == "marker":
-                brush = QBrush(QColor(obj["color"]))
+                painter.drawPolyline(obj.points)
+            elif obj.type == "marker":
+                brush = QBrush(QColor(obj.color))
                 painter.setBrush(brush)
                 painter.setPen(Qt.PenStyle.NoPen)
-                painter.drawEllipse(obj["pos"].x() - 8, obj["pos"].y() - 8, 16, 16)
-            elif obj["type"] == "text":
+                painter.drawEllipse(obj.pos.x() - 8, obj.pos.y() - 8, 16, 16)
+            elif obj.type == "text":
                 font = QFont("Uncial Antiqua", 10)
                 painter.setFont(font)
                 painter.setPen(QColor("black"))
-                painter.drawText(obj["pos"], obj["text"])
+                painter.drawText(obj.pos, obj.text)
 
         painter.end()
         image.save(path)
@@ -122,6 +123,12 @@ class MapEditor(QWidget):
 
     def set_quest_id(self, quest_id):
         """Вызывается извне, когда выбран квест."""
+        # Рисунок прежнего квеста не должен сохраниться как карта нового
+        if self.current_quest_id is not None and quest_id != self.current_quest_id:
+            self.scene.clear()
+            self.drawing = False
+            self.current_path.clear()
+            self.canvas.update()
         self.current_quest_id = quest_id
 
     def load_background(self):
@@ -140,7 +147,7 @@ class MapEditor(QWidget):
 
         timestamp = self.canvas.get_timestamp()
         filename = f"map_{self.current_quest_id}_{timestamp}.png"
-        path = Path("./parchments") / filename
+        path = Path(__file__).parent.parent / "parchments" / filename
         path.parent.mkdir(exist_ok=True)
 
         self.scene.save_to_image(800, 600, str(path))
@@ -166,20 +173,12 @@ class MapEditor(QWidget):
                 "Подземелье": "#DC143C",  # Красный
                 "Таверна": "#FFD700"      # Жёлтый
             }
-            self.scene.add_object({
-                "type": "marker",
-                "pos": pos,
-                "color": color_map[tool]
-            })
+            self.scene.add_object(MapMarker(pos, color_map[tool]))
             self.canvas.update()
         elif tool == "Текст":
             text = self.text_input.text().strip()
             if text:
-                self.scene.add_object({
-                    "type": "text",
-                    "pos": pos,
-                    "text": text
-                })
+                self.scene.add_object(MapText(pos, text))
                 self.text_input.clear()
                 self.canvas.update()
 
@@ -190,10 +189,7 @@ class MapEditor(QWidget):
 
     def finish_drawing(self):
         if self.drawing and len(self.current_path) > 1:
-            self.scene.add_object({
-                "type": "path",
-                "points": self.current_path.copy()
-            })
+            self.scene.add_object(MapPath(self.current_path.copy()))
         self.drawing = False
         self.current_path.clear()
 
@@ -226,22 +222,22 @@ class MapCanvas(QWidget):
 
         # Объекты сцены
         for obj in self.editor.scene.objects:
-            if obj["type"] == "path":
+            if obj.type == "path":
                 pen = QPen(QColor("#8B4513"), 3)
                 painter.setPen(pen)
-                if len(obj["points"]) > 1:
-                    painter.drawPolyline(obj["points"])
-            elif obj["type"] == "marker":
-                brush = QBrush(QColor(obj["color"]))
+                if len(obj.points) > 1:
+                    painter.drawPolyline(obj.points)
+            elif obj.type == "marker":
+                brush = QBrush(QColor(obj.color))
                 painter.setBrush(brush)
                 painter.setPen(Qt.PenStyle.NoPen)
-                pt = obj["pos"]
+                pt = obj.pos
                 painter.drawEllipse(pt.x() - 8, pt.y() - 8, 16, 16)
-            elif obj["type"] == "text":
+            elif obj.type == "text":
                 font = QFont("Uncial Antiqua", 10)
                 painter.setFont(font)
                 painter.setPen(QColor("black"))
-                painter.drawText(obj["pos"], obj["text"])
+                painter.drawText(obj.pos, obj.text)
 
         if self.editor.drawing and len(self.editor.current_path) > 1:
             pen = QPen(QColor("#8B4513"), 3, Qt.PenStyle.DotLine)
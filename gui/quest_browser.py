@@ -0,0 +1,241 @@
+import sqlite3
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTableView, QAbstractItemView
+from PyQt6.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+)
+from core import database
+from core.database import BROWSE_COLUMNS, fetch_quest_page
+
+PAGE_SIZE = 200
+MAX_PAGES = 20  # в памяти не больше MAX_PAGES * PAGE_SIZE строк
+
+HEADERS = ("ID", "Название", "Сложность", "Награда", "Срок", "Создан")
+
+
+class _PageSignals(QObject):
+    loaded = pyqtSignal(int, int, object)  # поколение модели, номер страницы, строки
+
+
+class _PageLoader(QRunnable):
+    """Читает одну страницу квестов в фоновом потоке (своё соединение на запрос)."""
+    def __init__(self, signals, generation, page, sort_column, descending, after, title_filter):
+        super().__init__()
+        self.signals = signals
+        self.args = (generation, page, sort_column, descending, after, title_filter)
+
+    def run(self):
+        generation, page, sort_column, descending, after, title_filter = self.args
+        try:
+            conn = sqlite3.connect(database.DB_PATH)
+            try:
+                rows = fetch_quest_page(conn, sort_column, descending, after, title_filter, PAGE_SIZE)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            rows = []
+        self.signals.loaded.emit(generation, page, rows)
+
+
+class QuestTableModel(QAbstractTableModel):
+    """
+    Ленивая модель списка квестов.
+
+    Строки подгружаются страницами по мере прокрутки (canFetchMore/fetchMore) с keyset-пагинацией.
+    Для каждой страницы хранится только якорь — ключ последней строки предыдущей; сами строки держатся
+    в LRU-окне из MAX_PAGES страниц, а вытесненные страницы перечитываются при возврате к ним.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._signals = _PageSignals()
+        self._signals.loaded.connect(self._on_page_loaded)
+        self._pool = QThreadPool.globalInstance()
+        self.sort_column = "id"
+        self.descending = False
+        self.title_filter = ""
+        self._conn = None
+        self._conn_path = None
+        self._data_version = None
+        self._reset_state()
+
+    def _reset_state(self):
+        self._generation = getattr(self, "_generation", 0) + 1
+        self._row_count = 0
+        self._pages = OrderedDict()
+        self._anchors = [None]  # _anchors[n] — ключ (значение, id) последней строки страницы n-1
+        self._loading = set()
+        self._exhausted = False
+
+    def _request_page(self, page):
+        if page in self._loading:
+            return
+        self._loading.add(page)
+        self._pool.start(_PageLoader(
+            self._signals, self._generation, page,
+            self.sort_column, self.descending, self._anchors[page], self.title_filter
+        ))
+
+    def _on_page_loaded(self, generation, page, rows):
+        if generation != self._generation:
+            return  # ответ на устаревший запрос (сменилась сортировка или фильтр)
+        self._loading.discard(page)
+        self._pages[page] = rows
+        self._pages.move_to_end(page)
+        while len(self._pages) > MAX_PAGES:
+            self._pages.popitem(last=False)
+
+        first = page * PAGE_SIZE
+        if page == len(self._anchors) - 1 and first == self._row_count:
+            # Новая страница в конце списка
+            if len(rows) == PAGE_SIZE:
+                sort_index = BROWSE_COLUMNS.index(self.sort_column)
+                self._anchors.append((rows[-1][sort_index], rows[-1][0]))
+            else:
+                self._exhausted = True
+            if rows:
+                self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+                self._row_count += len(rows)
+                self.endInsertRows()
+        elif rows:
+            # Перечитанная вытесненная страница
+            self.dataChanged.emit(self.index(first, 0), self.index(first + len(rows) - 1, len(HEADERS) - 1))
+
+    def _row(self, row):
+        page = row // PAGE_SIZE
+        rows = self._pages.get(page)
+        if rows is None:
+            self._request_page(page)
+            return None
+        self._pages.move_to_end(page)
+        offset = row % PAGE_SIZE
+        return rows[offset] if offset < len(rows) else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row = self._row(index.row())
+        if row is None:
+            return "…"
+        value = row[index.column()]
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return False
+        return (len(self._anchors) - 1) not in self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._request_page(len(self._anchors) - 1)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = BROWSE_COLUMNS[column]
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        self.refresh()
+
+    def set_title_filter(self, text):
+        self.title_filter = text.strip()
+        self.refresh()
+
+    def _current_data_version(self):
+        # PRAGMA data_version меняется при любом чужом коммите (других соединений и процессов),
+        # но сравнивать его можно только в пределах одного соединения
+        try:
+            if self._conn is None or self._conn_path != database.DB_PATH:
+                if self._conn is not None:
+                    self._conn.close()
+                self._conn = sqlite3.connect(database.DB_PATH)
+                self._conn_path = database.DB_PATH
+                self._data_version = None
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+    def is_stale(self):
+        """Изменилась ли база с последнего refresh()."""
+        data_version = self._current_data_version()
+        return data_version is None or data_version != self._data_version
+
+    def refresh(self):
+        self._data_version = self._current_data_version()
+        self.beginResetModel()
+        self._reset_state()
+        self.endResetModel()
+        self.fetchMore()
+
+    def quest_id_at(self, row):
+        data = self._row(row)
+        return data[0] if data else None
+
+
+class QuestBrowser(QWidget):
+    quest_selected = pyqtSignal(int)   # выбрана строка
+    quest_activated = pyqtSignal(int)  # двойной клик / Enter — открыть в мастере
+
+    def __init__(self):
+        super().__init__()
+        self.model = QuestTableModel(self)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Поиск по названию:"))
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Часть названия квеста")
+        filter_layout.addWidget(self.filter_edit)
+        layout.addLayout(filter_layout)
+
+        # Фильтр применяется после паузы в наборе, а не на каждую букву
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(lambda: self.model.set_title_filter(self.filter_edit.text()))
+        self.filter_edit.textChanged.connect(lambda: self.filter_timer.start())
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(24)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        self.table.selectionModel().currentRowChanged.connect(self.on_current_row_changed)
+        self.table.activated.connect(self.on_activated)
+        layout.addWidget(self.table)
+
+        self.setLayout(layout)
+
+    def on_current_row_changed(self, current, previous):
+        quest_id = self.model.quest_id_at(current.row()) if current.isValid() else None
+        if quest_id is not None:
+            self.quest_selected.emit(quest_id)
+
+    def on_activated(self, index):
+        quest_id = self.model.quest_id_at(index.row())
+        if quest_id is not None:
+            self.quest_activated.emit(quest_id)
+
+    def refresh(self):
+        self.model.refresh()
+
+    def refresh_if_stale(self):
+        """Перечитывает список, только если квесты менялись: иначе сохраняются прокрутка и выделение."""
+        if self.model.is_stale():
+            self.refresh()
@@ -5,17 +5,19 @@ from PyQt6.QtWidgets import (
     QComboBox, QSpinBox, QTextEdit, QDateTimeEdit, QPushButton,
     QMessageBox, QCheckBox
 )
-from PyQt6.QtCore import QDateTime, Qt
+from PyQt6.QtCore import QDateTime, QFileSystemWatcher, Qt
 from PyQt6.QtGui import QKeySequence, QShortcut
-from core.database import save_quest, DB_PATH
+from core.database import save_quest
 from core.gamification import GamificationManager
-import sqlite3
+from core.quest_cache import get_quest
+from core.template_env import list_templates, template_dirs
 
 
 class QuestWizard(QWidget):
     def __init__(self):
         super().__init__()
         self.current_quest_id = None
+        self.has_unsaved_draft = False  # есть правки, которые автосохранение ещё не записало
         self.setup_ui()
         self.setup_connections()
         self.setup_shortcuts()
@@ -60,14 +62,15 @@ class QuestWizard(QWidget):
         layout.addWidget(self.create_btn)
 
         # Выбор шаблона
+        # Встроенные шаблоны и шаблоны из QUEST_MASTER_TEMPLATE_DIRS
         self.template_combo = QComboBox()
-        self.template_combo.addItems([
-            "royal_decree.html",
-            "guild_contract.html",
-            "ancient_scroll.html"
-        ])
+        self.template_combo.addItems(list_templates())
+        self.template_combo.setCurrentText("royal_decree.html")
         layout.addWidget(QLabel("Шаблон документа:"))
         layout.addWidget(self.template_combo)
+        # Новые и удалённые шаблоны появляются в списке без перезапуска
+        self.template_watcher = QFileSystemWatcher([str(d) for d in template_dirs() if d.is_dir()], self)
+        self.template_watcher.directoryChanged.connect(self.refresh_templates)
 
         # Кнопки экспорта
         export_layout = QHBoxLayout()
@@ -110,6 +113,37 @@ class QuestWizard(QWidget):
                 description=description,
                 deadline=deadline
             )
+            self.has_unsaved_draft = False
+        else:
+            self.has_unsaved_draft = bool(title or description)
+
+    def load_quest(self, quest):
+        """Открывает сохранённый квест в мастере без повторного автосохранения."""
+        editors = (self.title_edit, self.diff_combo, self.reward_spin, self.desc_edit, self.deadline_edit)
+        for editor in editors:
+            editor.blockSignals(True)
+        try:
+            self.title_edit.setText(quest["title"])
+            self.diff_combo.setCurrentText(quest["difficulty"] or "")
+            self.reward_spin.setValue(quest["reward"] or 0)
+            self.desc_edit.setPlainText(quest["description"] or "")
+            deadline = QDateTime.fromString(quest["deadline"] or "", "yyyy-MM-dd HH:mm:ss")
+            if deadline.isValid():
+                self.deadline_edit.setDateTime(deadline)
+        finally:
+            for editor in editors:
+                editor.blockSignals(False)
+        self.current_quest_id = quest["id"]
+        self.has_unsaved_draft = False
+
+    def refresh_templates(self):
+        current = self.template_combo.currentText()
+        names = list_templates()
+        self.template_combo.blockSignals(True)
+        self.template_combo.clear()
+        self.template_combo.addItems(names)
+        self.template_combo.setCurrentText(current if current in names else "royal_decree.html")
+        self.template_combo.blockSignals(False)
 
     def validate_fields(self):
         valid = True
@@ -140,35 +174,16 @@ class QuestWizard(QWidget):
         else:
             QMessageBox.warning(self, "Ошибка", "Заполните название и описание (минимум 50 слов).")
 
-    def _get_quest_by_id(self, quest_id):
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT id, title, difficulty, reward, description, deadline FROM quests WHERE id = ?",
-            (quest_id,)
-        )
-        row = cur.fetchone()
-        conn.close()
-        if row:
-            return {
-                "id": row[0],
-                "title": row[1],
-                "difficulty": row[2],
-                "reward": row[3],
-                "description": row[4],
-                "deadline": row[5]
-            }
-        return None
-
     def export_pdf(self):
         if not self.current_quest_id:
             QMessageBox.warning(self, "Ошибка", "Сначала создайте квест!")
             return
         try:
-            from core.template_engine import export_to_pdf
-            quest_data = self._get_quest_by_id(self.current_quest_id)
-            path = export_to_pdf(
+            from core.template_engine import TemplateEngine
+            quest_data = get_quest(self.current_quest_id)
+            path = TemplateEngine.export(
                 quest_data,
+                format="pdf",
                 template=self.template_combo.currentText(),
                 with_qr=self.qr_checkbox.isChecked()
             )
@@ -184,10 +199,11 @@ class QuestWizard(QWidget):
             QMessageBox.warning(self, "Ошибка", "Сначала создайте квест!")
             return
         try:
-            from core.template_engine import export_to_docx
-            quest_data = self._get_quest_by_id(self.current_quest_id)
-            path = export_to_docx(
+            from core.template_engine import TemplateEngine
+            quest_data = get_quest(self.current_quest_id)
+            path = TemplateEngine.export(
                 quest_data,
+                format="docx",
                 template=self.template_combo.currentText(),
                 with_qr=self.qr_checkbox.isChecked()
             )
@@ -0,0 +1,22 @@
+import pytest
+
+import core.database as database
+import core.template_env as template_env
+
+
+@pytest.fixture(autouse=True)
+def quest_db(tmp_path, monkeypatch):
+    """Каждый тест работает со своей свежей базой квестов."""
+    db_path = tmp_path / "quests.db"
+    monkeypatch.setattr(database, "DB_PATH", db_path)
+    database.init_db()
+    return db_path
+
+
+@pytest.fixture(autouse=True)
+def template_cache(tmp_path, monkeypatch):
+    """Кеш шаблонов — во временном каталоге: тесты не пишут в ~/.cache/quest_master."""
+    monkeypatch.setattr(template_env, "BYTECODE_DIR", tmp_path / "bytecode")
+    monkeypatch.setattr(template_env, "PRECOMPILED_DIR", tmp_path / "precompiled")
+    monkeypatch.setattr(template_env, "USER_TEMPLATE_DIRS", [])
+    monkeypatch.setattr(template_env, "_env", None)
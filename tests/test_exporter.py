@@ -0,0 +1,66 @@
+import csv
+import json
+import zipfile
+
+from core import exporter
+from core.database import save_quest
+
+DESCRIPTION = " ".join(["Квест для проверки выгрузки."] * 15)
+
+
+def seed_quests(count):
+    ids = []
+    for i in range(count):
+        ids.append(save_quest(f"Квест #{i}", "Средний", 100 + i, DESCRIPTION, "2025-12-31 23:59:59"))
+    return ids
+
+
+def test_jsonl_export_with_versions(tmp_path):
+    ids = seed_quests(5)
+    save_quest("Квест #0", "Сложный", 500, DESCRIPTION, "2025-12-31 23:59:59")
+
+    summary = exporter.export_quests(tmp_path / "backup.jsonl", with_versions=True, batch_size=2)
+
+    records = [json.loads(line) for line in (tmp_path / "backup.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [r["id"] for r in records] == ids
+    assert [v["difficulty"] for v in records[0]["versions"]] == ["Средний", "Сложный"]
+    assert summary["quests"] == 5
+    assert summary["versions"] == 6
+
+
+def test_incremental_export_since_version(tmp_path):
+    seed_quests(3)
+    first = exporter.export_quests(tmp_path / "full.csv")
+    save_quest("Квест #1", "Лёгкий", 1, DESCRIPTION, "2025-12-31 23:59:59")
+
+    summary = exporter.export_quests(tmp_path / "delta.csv", with_versions=True,
+                                     since_version=first["last_version_id"])
+
+    with open(tmp_path / "delta.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["title"] for r in rows] == ["Квест #1"]
+    assert len(json.loads(rows[0]["versions"])) == 1
+    assert summary["last_version_id"] == first["last_version_id"] + 1
+
+
+def test_zip_export_includes_parchments(tmp_path, monkeypatch):
+    ids = seed_quests(2)
+    parchments = tmp_path / "parchments"
+    parchments.mkdir()
+    (parchments / f"{ids[1]}_20250101_120000.pdf").write_bytes(b"%PDF")
+    (parchments / f"{ids[0]}_20250101_120000_1a2b3c4d.docx").write_bytes(b"PK")
+    (parchments / "qr_1_20250101_120000_1a2b3c4d.png").write_bytes(b"tmp")
+    monkeypatch.setattr(exporter, "PARCHMENTS_DIR", parchments)
+
+    summary = exporter.export_quests(tmp_path / "backup.zip", with_parchments=True)
+
+    with zipfile.ZipFile(tmp_path / "backup.zip") as zf:
+        names = set(zf.namelist())
+        manifest = json.loads(zf.read("manifest.json"))
+        info = zf.getinfo("quests.jsonl")
+    assert names == {"quests.jsonl", "manifest.json", f"parchments/{ids[1]}_20250101_120000.pdf",
+                     f"parchments/{ids[0]}_20250101_120000_1a2b3c4d.docx"}
+    assert manifest["quests"] == 2
+    assert summary["parchments"] == 2
+    # Потоковая запись в формате ZIP64 — иначе выгрузка больше 2 ГиБ падает на закрытии
+    assert info.extract_version >= zipfile.ZIP64_VERSION
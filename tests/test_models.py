@@ -0,0 +1,56 @@
+import sqlite3
+
+from core import database
+from core.database import get_quest_by_id, get_recent_versions, iter_quests, load_descriptions, save_quest
+from core.models import Quest
+from core.template_engine import render_template
+
+DESCRIPTION = " ".join(["Описание квеста, которое нужно не всегда."] * 10)
+
+
+def test_quest_record_replaces_dict():
+    quest_id = save_quest("Василиск", "Сложный", 700, DESCRIPTION, "2025-12-31 23:59:59")
+
+    quest = get_quest_by_id(quest_id)
+
+    assert isinstance(quest, Quest)
+    assert not hasattr(quest, "__dict__")
+    assert quest["title"] == quest.title == "Василиск"
+    assert dict(quest)["reward"] == 700
+    html = render_template("ancient_scroll.html", {"quest": quest, "current_date": ""})
+    assert "Василиск" in html and "нужно не всегда" in html
+
+
+def test_description_is_loaded_on_demand():
+    save_quest("Минотавр", "Средний", 300, DESCRIPTION, "2025-12-31 23:59:59")
+
+    quest = next(iter_quests())
+
+    assert not quest.description_loaded
+    assert quest.description == DESCRIPTION
+    assert quest.description_loaded
+
+
+def test_descriptions_are_loaded_in_one_query():
+    for i in range(5):
+        save_quest(f"Гидра {i}", "Сложный", 100 + i, f"{DESCRIPTION} {i}", "2025-12-31 23:59:59")
+    quests = list(iter_quests())
+    conn = sqlite3.connect(database.DB_PATH)
+    statements = []
+    conn.set_trace_callback(statements.append)
+
+    load_descriptions(quests, conn, batch_size=3)
+
+    assert len(statements) == 2
+    assert all(q.description_loaded for q in quests)
+    assert [q.description for q in quests] == [f"{DESCRIPTION} {i}" for i in range(5)]
+    conn.close()
+
+
+def test_version_record_supports_get():
+    quest_id = save_quest("Химера", "Средний", 300, DESCRIPTION, "2025-12-31 23:59:59")
+
+    version = get_recent_versions(quest_id)[0]
+
+    assert version.get("title") == "Химера"
+    assert version.get("missing", "—") == "—"
@@ -0,0 +1,82 @@
+import sqlite3
+
+from core import database
+from core.database import save_quest, save_quests
+from core.quest_cache import QuestCache, quest_cache
+
+DESCRIPTION = "Квест для проверки кеша."
+
+
+def test_hits_and_write_through_invalidation():
+    quest_id = save_quest("Гидра", "Сложный", 300, DESCRIPTION, "2025-12-31 23:59:59")
+    quest_cache.clear()
+
+    assert quest_cache.get_quest(quest_id)["reward"] == 300
+    hits = quest_cache.hits
+    assert quest_cache.get_quest(quest_id)["reward"] == 300
+    assert quest_cache.hits == hits + 1
+
+    save_quest("Гидра", "Сложный", 900, DESCRIPTION, "2025-12-31 23:59:59")
+
+    assert quest_cache.get_quest(quest_id)["reward"] == 900
+    assert [v["reward"] for v in quest_cache.get_recent_versions(quest_id)] == [900, 300]
+
+
+def test_bulk_write_returns_ids_and_invalidates():
+    first_id = save_quest("Квест A", "Лёгкий", 10, DESCRIPTION, "2025-12-31 23:59:59")
+    quest_cache.get_quest(first_id)
+
+    ids = save_quests([
+        ("Квест B", "Лёгкий", 20, DESCRIPTION, "2025-12-31 23:59:59"),
+        ("Квест A", "Средний", 15, DESCRIPTION, "2025-12-31 23:59:59"),
+    ])
+
+    assert ids[1] == first_id
+    assert quest_cache.get_quest(first_id)["difficulty"] == "Средний"
+
+
+def test_external_writes_are_detected_by_data_version():
+    cache = QuestCache()
+    quest_id = save_quest("Кракен", "Олимпийский", 1000, DESCRIPTION, "2025-12-31 23:59:59")
+    assert cache.get_quest(quest_id)["reward"] == 1000
+
+    # Запись мимо save_quest — как из другого процесса
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute("UPDATE quests SET reward = 5 WHERE id = ?", (quest_id,))
+    conn.commit()
+    conn.close()
+
+    assert cache.get_quest(quest_id)["reward"] == 5
+
+
+def test_lru_is_bounded():
+    cache = QuestCache(max_quests=2)
+    ids = [save_quest(f"Квест {i}", "Лёгкий", 10, DESCRIPTION, "2025-12-31 23:59:59") for i in range(3)]
+
+    for quest_id in ids:
+        cache.get_quest(quest_id)
+
+    assert cache.stats()["quests"] == 2
+    assert cache.get_quest(ids[0]) is not None
+    assert cache.stats()["misses"] == 4
+
+
+def test_own_writes_keep_other_entries_cached():
+    first = save_quest("Квест A", "Лёгкий", 10, DESCRIPTION, "2025-12-31 23:59:59")
+    second = save_quest("Квест B", "Лёгкий", 20, DESCRIPTION, "2025-12-31 23:59:59")
+    quest_cache.clear()
+    quest_cache.get_quest(first)
+    quest_cache.get_quest(second)
+    invalidations = quest_cache.invalidations
+
+    save_quest("Квест B", "Средний", 25, DESCRIPTION, "2025-12-31 23:59:59")
+    hits = quest_cache.hits
+
+    assert quest_cache.get_quest(first)["reward"] == 10
+    assert quest_cache.hits == hits + 1
+    assert quest_cache.get_quest(second)["reward"] == 25
+    assert quest_cache.invalidations == invalidations + 1
+
+    # Запись квеста, которого нет в кеше, не считается инвалидацией
+    save_quest("Квест C", "Лёгкий", 30, DESCRIPTION, "2025-12-31 23:59:59")
+    assert quest_cache.invalidations == invalidations + 1
@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from core import database
+from core.database import BROWSE_COLUMNS, fetch_quest_page, save_quests
+
+DESCRIPTION = "Квест для проверки постраничного чтения."
+
+
+def read_all(conn, sort_column, descending, title_filter=None, limit=3):
+    """Проходит всю таблицу страницами по якорям, как это делает браузер квестов."""
+    rows, after = [], None
+    sort_index = BROWSE_COLUMNS.index(sort_column)
+    while True:
+        page = fetch_quest_page(conn, sort_column, descending, after, title_filter, limit)
+        rows.extend(page)
+        if len(page) < limit:
+            return rows
+        after = (page[-1][sort_index], page[-1][0])
+
+
+@pytest.mark.parametrize("sort_column", ["id", "title", "difficulty", "reward"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_match_full_sort(sort_column, descending):
+    save_quests([
+        (f"Квест {i:02d}", ["Лёгкий", "Сложный"][i % 2], None if i % 4 == 0 else i % 3, DESCRIPTION, "2025-12-31")
+        for i in range(11)
+    ])
+    conn = sqlite3.connect(database.DB_PATH)
+
+    paged = read_all(conn, sort_column, descending)
+    full = conn.execute(f"""
+        SELECT {", ".join(BROWSE_COLUMNS)} FROM quests
+        ORDER BY {sort_column} {"DESC" if descending else "ASC"}, id {"DESC" if descending else "ASC"}
+    """).fetchall()
+    conn.close()
+
+    assert paged == full
+
+
+def test_title_filter_is_pushed_to_sql():
+    save_quests([
+        ("Дракон севера", "Сложный", 100, DESCRIPTION, "2025-12-31"),
+        ("Гоблины", "Лёгкий", 10, DESCRIPTION, "2025-12-31"),
+        ("Дракон_юга", "Сложный", 200, DESCRIPTION, "2025-12-31"),
+    ])
+    conn = sqlite3.connect(database.DB_PATH)
+
+    assert [r[1] for r in read_all(conn, "id", False, "Дракон")] == ["Дракон севера", "Дракон_юга"]
+    assert [r[1] for r in read_all(conn, "id", False, "н_ю")] == ["Дракон_юга"]
+    conn.close()
+
+
+def test_title_filter_ignores_cyrillic_case():
+    save_quests([
+        ("Дракон севера", "Сложный", 100, DESCRIPTION, "2025-12-31"),
+        ("Логово дракона", "Средний", 50, DESCRIPTION, "2025-12-31"),
+        ("Гоблины", "Лёгкий", 10, DESCRIPTION, "2025-12-31"),
+    ])
+    conn = sqlite3.connect(database.DB_PATH)
+
+    assert [r[1] for r in read_all(conn, "id", False, "дракон")] == ["Дракон севера", "Логово дракона"]
+    assert [r[1] for r in read_all(conn, "id", False, "ДРАКОН")] == ["Дракон севера", "Логово дракона"]
+    conn.close()
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from core import render_daemon
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    """Демон на временном сокете; рендер подменён (и идёт в потоке), чтобы не требовать WeasyPrint."""
+    socket_path = tmp_path / "render.sock"
+    monkeypatch.setattr(render_daemon, "SOCKET_PATH", socket_path)
+
+    daemon = render_daemon.RenderDaemon(socket_path, workers=1, queue_size=4)
+    monkeypatch.setattr(daemon, "_create_pool", lambda: ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(daemon, "warm_up", lambda: None)
+
+    def render(request):
+        if request["template"] == "my_template.html":
+            raise render_daemon.UnknownTemplate(request["template"])
+        return f"/parchments/{request['quest']['id']}.{request['format']}"
+
+    monkeypatch.setattr(daemon, "_render", render)
+
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(daemon.serve())
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if render_daemon.daemon_available(socket_path):
+            break
+        time.sleep(0.01)
+    yield daemon
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(timeout=1)
+
+
+def test_render_goes_through_daemon(daemon):
+    quest = {"id": 7, "title": "Дракон", "difficulty": "Сложный", "reward": 500, "description": "", "deadline": ""}
+
+    path = render_daemon.render_via_daemon(quest, "pdf", "royal_decree.html", False)
+
+    assert path == Path("/parchments/7.pdf")
+    stats = render_daemon.send_request({"op": "stats"})
+    assert stats["rendered"] == 1
+    assert stats["rejected"] == 0
+
+
+def test_fallback_when_daemon_is_not_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_daemon, "SOCKET_PATH", tmp_path / "missing.sock")
+
+    assert render_daemon.render_via_daemon({"id": 1}, "pdf", "royal_decree.html", False) is None
+
+
+def test_unknown_template_falls_back_to_local_render(daemon):
+    # Шаблон из пользовательского каталога клиента: демон его не видит, рендерим у себя
+    quest = {"id": 8, "title": "Гоблины", "difficulty": "Лёгкий", "reward": 10, "description": "", "deadline": ""}
+
+    assert render_daemon.render_via_daemon(quest, "pdf", "my_template.html", False) is None
+    assert render_daemon.send_request({"op": "stats"})["failed"] == 1
@@ -0,0 +1,68 @@
+import io
+import os
+
+from core import template_env
+
+QUEST = {"id": 3, "title": "Тролль", "difficulty": "Средний", "reward": 200, "description": "", "deadline": ""}
+
+
+def test_bytecode_cache_is_written():
+    html = "".join(template_env.generate("royal_decree.html", {"quest": QUEST, "current_date": ""}))
+
+    assert "Тролль" in html
+    assert list(template_env.BYTECODE_DIR.iterdir())
+
+
+def test_precompiled_templates_are_used():
+    template_env.precompile_templates()
+
+    env = template_env.get_environment()
+    output = io.StringIO()
+    template_env.render_to_stream("guild_contract.html", {"quest": QUEST, "current_date": ""}, output)
+
+    assert "Тролль" in output.getvalue()
+    assert env.get_template("guild_contract.html").filename.startswith(str(template_env.PRECOMPILED_DIR))
+
+
+def test_user_template_dir_overrides_and_reloads(tmp_path):
+    user_dir = tmp_path / "user_templates"
+    user_dir.mkdir()
+    template = user_dir / "royal_decree.html"
+    template.write_text("v1 {{ quest.title }}", encoding="utf-8")
+    template_env.add_template_dir(user_dir)
+
+    assert "".join(template_env.generate("royal_decree.html", {"quest": QUEST})) == "v1 Тролль"
+
+    template.write_text("v2 {{ quest.title }}", encoding="utf-8")
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert "".join(template_env.generate("royal_decree.html", {"quest": QUEST})) == "v2 Тролль"
+    assert "royal_decree.html" in template_env.list_templates()
+
+
+def test_new_user_template_overrides_loaded_builtin(tmp_path, monkeypatch):
+    user_dir = tmp_path / "user_templates"
+    user_dir.mkdir()
+    monkeypatch.setattr(template_env, "USER_TEMPLATE_DIRS", [user_dir])
+    assert "Тролль" in "".join(template_env.generate("royal_decree.html", {"quest": QUEST, "current_date": ""}))
+
+    (user_dir / "royal_decree.html").write_text("свой {{ quest.title }}", encoding="utf-8")
+
+    assert "".join(template_env.generate("royal_decree.html", {"quest": QUEST})) == "свой Тролль"
+
+
+def test_stale_precompiled_template_is_not_used(tmp_path, monkeypatch):
+    builtin_dir = tmp_path / "builtin"
+    builtin_dir.mkdir()
+    template = builtin_dir / "scroll.html"
+    template.write_text("v1 {{ quest.title }}", encoding="utf-8")
+    monkeypatch.setattr(template_env, "TEMPLATES_DIR", builtin_dir)
+    template_env.precompile_templates()
+    assert "".join(template_env.generate("scroll.html", {"quest": QUEST})) == "v1 Тролль"
+
+    template.write_text("v2 {{ quest.title }}", encoding="utf-8")
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert "".join(template_env.generate("scroll.html", {"quest": QUEST})) == "v2 Тролль"
@@ -0,0 +1,76 @@
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from core import database, stress
+from core.writer import QuestWriter
+
+DESCRIPTION = "Квест для проверки очереди записи."
+
+
+def test_concurrent_writers_share_group_commit():
+    writer = QuestWriter(linger=0.01)
+    ids, errors = [], []
+
+    def write(worker):
+        try:
+            for i in range(25):
+                ids.append(writer.save(f"Квест {worker}-{i}", "Средний", i, DESCRIPTION, "2025-12-31"))
+        except Exception as e:
+            errors.append(e)
+
+    # Часть потоков пишет через очередь, часть — напрямую через save_quest
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    threads.append(threading.Thread(target=lambda: [
+        database.save_quest(f"Прямой {i}", "Лёгкий", i, DESCRIPTION, "2025-12-31") for i in range(25)
+    ]))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+
+    assert not errors
+    assert len(set(ids)) == 200
+    conn = sqlite3.connect(database.DB_PATH)
+    assert conn.execute("SELECT COUNT(*) FROM quests").fetchone()[0] == 225
+    conn.close()
+    assert writer.stats["batches"] < 200
+
+
+def test_invalid_quest_fails_alone():
+    writer = QuestWriter(linger=0.05)
+    good = writer.submit("Хороший квест", "Лёгкий", 10, DESCRIPTION, "2025-12-31")
+    bad = writer.submit("Плохой квест", "Невозможный", 10, DESCRIPTION, "2025-12-31")
+
+    assert good.result() > 0
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result()
+    writer.close()
+
+
+def test_bad_parameter_type_fails_alone():
+    writer = QuestWriter(linger=0.05)
+    good = writer.submit("Хороший квест", "Лёгкий", 10, DESCRIPTION, "2025-12-31")
+
+    with pytest.raises(TypeError):
+        writer.submit("Плохой квест", "Лёгкий", [1, 2], DESCRIPTION, "2025-12-31")
+    # Даже если непривязываемое значение обошло проверку, оно не роняет соседей по пачке
+    bad = Future()
+    writer._queue.put((("Плохой квест", "Лёгкий", [1, 2], DESCRIPTION, "2025-12-31"), bad))
+
+    assert good.result() > 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        bad.result()
+    writer.close()
+
+
+def test_stress_harness_reports_no_errors():
+    report = stress.run(writers=3, readers=1, mode="thread", via="queue", duration=0.3, db_path=database.DB_PATH)
+
+    assert report["writes"]["ops"] > 0
+    assert report["writes"]["errors"] == 0
+    assert report["reads"]["errors"] == 0
+    assert report["writer"]["batches"] > 0